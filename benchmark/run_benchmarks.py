@@ -0,0 +1,429 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+import matplotlib
+matplotlib.use('Agg')
+
+import numpy as np
+import pandas as pd
+import rasterio
+from rasterio.features import rasterize
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCHMARK_DIR)
+
+# The scripts live in sibling directories and are not installed as packages
+for directory in ('pop', 'weather', 'map', 'simulate_case_report'):
+    sys.path.insert(0, os.path.join(REPO_ROOT, directory))
+
+from aggregate_admin_levels import aggregate_admin_levels
+from aggregated_population_from_raster_using_shapefile_py import aggregate_population
+from generate_simulated_data import load_data, simulate_malaria_cases
+from weather_data_processing import (load_csv, load_woreda_to_region_mapping, missing_data_report,
+                                     plot_missing_data_time_series)
+
+import synthetic_data
+from synthetic_data import NO_DATA_VALUE
+
+BENCHMARKS = ['population_aggregation', 'missing_data_report', 'plot_missing_data_time_series',
+              'simulate_malaria_cases', 'aggregate_admin_levels']
+
+DEFAULT_HISTORY = os.path.join(BENCHMARK_DIR, 'benchmark_history.json')
+
+# Model constants of simulate_case_report/generate_simulated_data.py, restated so the
+# check does not share code with what it checks
+SIMULATION_COEFFICIENTS = {
+    'totprec': 0.002,
+    'lst_day': 0.007,
+    'lst_mean': 0.012,
+    'lst_night': 0.006,
+    'ndvi': 0.09,
+    'savi': 0.09,
+    'evi': 0.11,
+    'ndwi5': 0.06,
+    'ndwi6': 0.06
+}
+SIMULATION_DISPERSION = 1.5
+CASE_RATIOS = {
+    'Blood film P. falciparum': 0.6,
+    'RDT P. falciparum': 0.2,
+    'Blood film P. vivax': 0.15,
+    'RDT P. vivax': 0.05,
+}
+
+
+@contextlib.contextmanager
+def working_directory(path: str):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def time_call(func: Callable, setup: Callable[[], Tuple], replicates: int):
+    """Time func(*setup()) once per replicate, returning the timings and the last result.
+
+    setup runs outside the timed region and must return fresh arguments, because most
+    of the scripts modify the frames they are given. Their console output and progress
+    bars are discarded.
+    """
+    times = []
+    result = None
+    for _ in range(replicates):
+        args = setup()
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            start = time.perf_counter()
+            result = func(*args)
+            times.append(time.perf_counter() - start)
+    return times, result
+
+
+def population_totals_bincount(shapefile, raster_path: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Independent per-zone totals used to check aggregate_population.
+
+    Zones are burned in with their position + 1 rather than the shapefile index, so
+    no zone can collide with the background value. Returns the totals and a mask of
+    the zones that cover at least one pixel, both in shapefile order.
+    """
+    with rasterio.open(raster_path) as src:
+        population_data = src.read(1).astype('float64')
+        affine = src.transform
+    population_data[population_data == NO_DATA_VALUE] = 0
+
+    shapes = [(geom, position + 1) for position, geom in enumerate(shapefile.geometry)]
+    labels = rasterize(shapes, out_shape=population_data.shape, fill=0, transform=affine, all_touched=True, dtype='uint32')
+    totals = np.bincount(labels.ravel(), weights=population_data.ravel(), minlength=len(shapefile) + 1)
+    pixel_counts = np.bincount(labels.ravel(), minlength=len(shapefile) + 1)
+    return totals[1:], pixel_counts[1:] > 0
+
+
+def check_population_aggregation(shapefile, raster_paths: Dict[int, str], results_df: pd.DataFrame) -> List[str]:
+    errors = []
+    for year, raster_path in raster_paths.items():
+        totals, covered = population_totals_bincount(shapefile, raster_path)
+        expected = pd.Series(totals[covered], index=shapefile['ADMIN3'][covered])
+        got = results_df[results_df['year'] == year].set_index('ADMIN3')['popcount']
+        missing = expected.index.difference(got.index)
+        extra = got.index.difference(expected.index)
+        if len(missing) or len(extra):
+            errors.append(f"{year}: aggregated {len(got)} zones, expected {len(expected)}"
+                          f" (missing {list(missing[:5])}, unexpected {list(extra[:5])})")
+            continue
+        if not np.allclose(got[expected.index].to_numpy(dtype='float64'), expected.to_numpy(), rtol=1e-4):
+            errors.append(f"{year}: popcount differs from bincount totals")
+    return errors
+
+
+def longest_run(mask: np.ndarray) -> int:
+    """Length of the longest run of True values in a boolean array."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    return int((ends - starts).max()) if len(starts) else 0
+
+
+def check_missing_data_report(report: pd.DataFrame, df: pd.DataFrame, injected: Dict[str, np.ndarray]) -> List[str]:
+    errors = []
+    overall = report[report['category'] == 'overall'].set_index('column')
+    monthly = report[report['category'] == 'monthly']
+    regional = report[report['category'] == 'regional']
+    consecutive = report[report['category'] == 'consecutive']
+    if 'ADMIN3' in regional.columns:
+        regional = regional.set_index('ADMIN3')
+    if 'column' in consecutive.columns:
+        consecutive = consecutive.set_index('column')
+
+    for column, mask in injected.items():
+        count = int(mask.sum())
+        if column not in overall.index or column not in monthly.columns or column not in regional.columns:
+            errors.append(f"{column}: missing from the report")
+            continue
+        if overall.loc[column, 'Total Missing'] != count:
+            errors.append(f"{column}: overall missing {overall.loc[column, 'Total Missing']}, injected {count}")
+        if monthly[column].sum() != count:
+            errors.append(f"{column}: monthly missing sums to {monthly[column].sum()}, injected {count}")
+
+        expected_regional = pd.Series(mask, index=df.index).groupby(df['woreda']).sum()
+        got_regional = regional[column].reindex(expected_regional.index)
+        wrong = expected_regional.index[got_regional.to_numpy() != expected_regional.to_numpy()]
+        if len(wrong):
+            errors.append(f"{column}: regional missing counts wrong for {len(wrong)} woredas, e.g. {list(wrong[:5])}")
+
+        expected_run = longest_run(mask)
+        if column not in consecutive.index:
+            errors.append(f"{column}: no consecutive-missing entry, longest injected run is {expected_run}")
+        elif consecutive.loc[column, 'max_consecutive'] != expected_run:
+            errors.append(f"{column}: max consecutive missing {consecutive.loc[column, 'max_consecutive']}, "
+                          f"longest injected run is {expected_run}")
+    return errors
+
+
+def time_series_plot_path(directory: str, name: str) -> str:
+    return os.path.join(directory, f'missing_data_time_series_{name.lower().replace(" ", "_")}.png')
+
+
+def check_time_series_plot(directory: str, name: str) -> List[str]:
+    """Smoke check: the last timed call wrote its PNG (setup removes it beforehand)."""
+    path = time_series_plot_path(directory, name)
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return [f"{path} was not written"]
+    return []
+
+
+def expected_cases_reference(frames: Dict[str, pd.DataFrame], population: pd.DataFrame) -> pd.Series:
+    """Expected annual cases per (ADMIN3, year), computed from the fixtures rather than load_data()."""
+    annual = pd.concat([
+        frames['LST Data'].groupby(['woreda', 'year'])[synthetic_data.LST_COLUMNS].mean(),
+        frames['Precipitation Data'].groupby(['woreda', 'year'])[synthetic_data.PRECIP_COLUMNS].sum(),
+        frames['Spectral Data'].groupby(['woreda', 'year'])[synthetic_data.SPECTRAL_COLUMNS].mean(),
+    ], axis=1)
+    annual.index.names = ['ADMIN3', 'year']
+
+    expected = population.set_index(['ADMIN3', 'year'])['popcount'].reindex(annual.index) * 0.01
+    for var, coef in SIMULATION_COEFFICIENTS.items():
+        expected *= np.exp(np.clip(coef * annual[var].fillna(0), -10, 10))
+    return expected.clip(0.01, 1e6)
+
+
+def check_simulated_cases(weekly: Optional[pd.DataFrame], expected_cases: pd.Series, num_years: int,
+                          sigmas: float = 4.0) -> List[str]:
+    """Check the weekly output's shape and that its annual totals fit the expected cases.
+
+    Annual cases per woreda are negative binomial with mean expected_cases, split by
+    CASE_RATIOS and spread over 52 Poisson weeks. For each case type the mean of
+    observed / (ratio * expected) over all woreda-years should be 1, within `sigmas`
+    standard errors. The dispersion is high, so this catches wrong formulas or inputs
+    rather than small biases.
+    """
+    if weekly is None:
+        return ["simulation returned None (weather and population did not merge)"]
+    absent = [column for column in ['Woreda', 'year', *CASE_RATIOS] if column not in weekly.columns]
+    if absent:
+        return [f"simulated data has no {absent} columns"]
+
+    names = set(expected_cases.index.get_level_values('ADMIN3'))
+    errors = []
+    if len(weekly) != len(names) * num_years * 52:
+        errors.append(f"{len(weekly)} weekly rows, expected {len(names) * num_years * 52}")
+    if set(weekly['Woreda']) != names:
+        errors.append("simulated woredas differ from the fixture woredas")
+        return errors
+
+    observed = weekly.groupby(['Woreda', weekly['year'].astype(int)])[list(CASE_RATIOS)].sum()
+    observed = observed.reindex(expected_cases.index)
+    if observed.isnull().any().any():
+        errors.append(f"{int(observed.isnull().any(axis=1).sum())} woreda-years missing from the simulated data")
+        return errors
+
+    for column, ratio in CASE_RATIOS.items():
+        mean = ratio * expected_cases
+        z = observed[column] / mean
+        # Per-row variance of z: negative binomial part plus the weekly Poisson draws
+        variance = 1 / SIMULATION_DISPERSION + 2 / mean
+        standard_error = np.sqrt(variance.sum()) / len(z)
+        if abs(z.mean() - 1) > sigmas * standard_error:
+            errors.append(f"{column}: observed/expected averages {z.mean():.3f}, "
+                          f"expected 1 ± {sigmas * standard_error:.3f}")
+    return errors
+
+
+def check_aggregated_admin_levels(gdf, aggregated) -> List[str]:
+    errors = []
+    if 'ADMIN1' not in aggregated.columns:
+        return ["aggregated shapes have no ADMIN1 column"]
+    if len(aggregated) != gdf['ADMIN1'].nunique():
+        errors.append(f"{len(aggregated)} ADMIN1 shapes, expected {gdf['ADMIN1'].nunique()}")
+    with warnings.catch_warnings():
+        # Areas in degrees are fine for comparing a dissolve against its parts
+        warnings.simplefilter('ignore', UserWarning)
+        expected_area = gdf.geometry.area.groupby(gdf['ADMIN1']).sum()
+        got_area = aggregated.set_index('ADMIN1').geometry.area.reindex(expected_area.index)
+    # Regions absent from the output come through as NaN, which allclose counts as a mismatch
+    if not np.allclose(got_area.to_numpy(), expected_area.to_numpy(), rtol=1e-9):
+        errors.append("dissolved areas differ from the sum of their woredas")
+    return errors
+
+
+def make_record(benchmark: str, params: Dict, times: List[float], errors: List[str]) -> Dict:
+    return {
+        'benchmark': benchmark,
+        'params': params,
+        'times': times,
+        'min': min(times),
+        'median': statistics.median(times),
+        'mean': statistics.mean(times),
+        'correct': not errors,
+        'errors': errors,
+    }
+
+
+def run_population_benchmarks(zones: List[int], pixels: List[int], year_counts: List[int],
+                              replicates: int, seed: int, first_year: int) -> List[Dict]:
+    records = []
+    for num_zones in zones:
+        shapefile = synthetic_data.make_woreda_grid(num_zones)
+        for num_pixels in pixels:
+            for num_years in year_counts:
+                years = list(range(first_year, first_year + num_years))
+                with tempfile.TemporaryDirectory() as tmpdir:
+                    raster_paths = synthetic_data.write_population_rasters(tmpdir, num_pixels, years, seed=seed)
+                    times, results_df = time_call(aggregate_population,
+                                                  lambda: (shapefile, years, tmpdir), replicates)
+                    errors = check_population_aggregation(shapefile, raster_paths, results_df)
+                params = {'zones': num_zones, 'pixels': num_pixels, 'years': num_years}
+                records.append(make_record('population_aggregation', params, times, errors))
+                report_progress(records[-1])
+    return records
+
+
+def run_weather_benchmarks(selected: List[str], zones: List[int], year_counts: List[int],
+                           replicates: int, seed: int, first_year: int) -> List[Dict]:
+    records = []
+    for num_zones in zones:
+        grid = synthetic_data.make_woreda_grid(num_zones)
+        for num_years in year_counts:
+            years = list(range(first_year, first_year + num_years))
+            params = {'zones': num_zones, 'years': num_years}
+            frames, injected = synthetic_data.make_weather_frames(num_zones, years, seed=seed)
+
+            with tempfile.TemporaryDirectory() as tmpdir, working_directory(tmpdir):
+                csv_paths = synthetic_data.write_weather_csvs(tmpdir, frames)
+                woreda_to_region = load_woreda_to_region_mapping(synthetic_data.write_woreda_to_region(tmpdir, grid))
+                population = pd.read_csv(synthetic_data.write_population_csv(tmpdir, num_zones, years, seed=seed))
+                loaded = {name: load_csv(path) for name, path in csv_paths.items()}
+
+                for name, df in loaded.items():
+                    dataset = {**params, 'dataset': name}
+
+                    if 'missing_data_report' in selected:
+                        times, report = time_call(missing_data_report,
+                                                  lambda: (df.copy(), name, woreda_to_region), replicates)
+                        errors = check_missing_data_report(report, df, injected[name])
+                        records.append(make_record('missing_data_report', dataset, times, errors))
+                        report_progress(records[-1])
+
+                    if 'plot_missing_data_time_series' in selected:
+                        def plot_setup():
+                            # Remove the previous replicate's PNG so the check sees this run's output
+                            with contextlib.suppress(FileNotFoundError):
+                                os.remove(time_series_plot_path(tmpdir, name))
+                            return df.copy(), name
+
+                        times, _ = time_call(plot_missing_data_time_series, plot_setup, replicates)
+                        errors = check_time_series_plot(tmpdir, name)
+                        records.append(make_record('plot_missing_data_time_series', dataset, times, errors))
+                        report_progress(records[-1])
+
+                if 'simulate_malaria_cases' in selected:
+                    def simulation_setup():
+                        np.random.seed(seed)
+                        return load_data()
+
+                    times, weekly = time_call(simulate_malaria_cases, simulation_setup, replicates)
+                    errors = check_simulated_cases(weekly, expected_cases_reference(frames, population), num_years)
+                    records.append(make_record('simulate_malaria_cases', params, times, errors))
+                    report_progress(records[-1])
+    return records
+
+
+def run_admin_level_benchmarks(zones: List[int], replicates: int) -> List[Dict]:
+    records = []
+    for num_zones in zones:
+        gdf = synthetic_data.make_woreda_grid(num_zones)
+        times, aggregated = time_call(aggregate_admin_levels, lambda: (gdf.copy(), 'ADMIN3', 'ADMIN1'), replicates)
+        errors = check_aggregated_admin_levels(gdf, aggregated)
+        records.append(make_record('aggregate_admin_levels', {'zones': num_zones}, times, errors))
+        report_progress(records[-1])
+    return records
+
+
+def report_progress(record: Dict) -> None:
+    params = ', '.join(f"{key}={value}" for key, value in record['params'].items())
+    status = 'ok' if record['correct'] else 'FAILED: ' + '; '.join(record['errors'])
+    print(f"{record['benchmark']:<32} {params:<60} median {record['median']:9.4f}s  min {record['min']:9.4f}s  {status}")
+
+
+def git_revision() -> Optional[str]:
+    try:
+        revision = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=REPO_ROOT, capture_output=True,
+                                  text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=REPO_ROOT,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return revision + ('-dirty' if dirty else '')
+
+
+def append_history(history_path: str, run: Dict) -> None:
+    history = []
+    if os.path.exists(history_path):
+        with open(history_path) as f:
+            history = json.load(f)
+    history.append(run)
+    with open(history_path, 'w') as f:
+        json.dump(history, f, indent=2)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the data-gathering hot paths on synthetic data.")
+    parser.add_argument('--zones', type=int, nargs='+', default=[50, 200], help="number of synthetic woredas")
+    parser.add_argument('--pixels', type=int, nargs='+', default=[512, 2048], help="population raster side length")
+    parser.add_argument('--years', type=int, nargs='+', default=[1, 3], help="number of years of data")
+    parser.add_argument('--replicates', type=int, default=3, help="timed runs per parameter combination")
+    parser.add_argument('--first-year', type=int, default=2002)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--only', nargs='+', choices=BENCHMARKS, default=BENCHMARKS, help="benchmarks to run")
+    parser.add_argument('--history', default=DEFAULT_HISTORY, help="JSON file the results are appended to")
+    parser.add_argument('--label', default=None, help="free-form note stored with the run")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+
+    records = []
+    if 'population_aggregation' in args.only:
+        records += run_population_benchmarks(args.zones, args.pixels, args.years, args.replicates,
+                                             args.seed, args.first_year)
+    weather_benchmarks = [name for name in args.only
+                          if name in ('missing_data_report', 'plot_missing_data_time_series', 'simulate_malaria_cases')]
+    if weather_benchmarks:
+        records += run_weather_benchmarks(weather_benchmarks, args.zones, args.years, args.replicates,
+                                          args.seed, args.first_year)
+    if 'aggregate_admin_levels' in args.only:
+        records += run_admin_level_benchmarks(args.zones, args.replicates)
+
+    run = {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'label': args.label,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'settings': {key: value for key, value in vars(args).items() if key not in ('history', 'label')},
+        'results': records,
+    }
+    append_history(args.history, run)
+    print(f"\nResults appended to {args.history}")
+
+    failed = [record for record in records if not record['correct']]
+    if failed:
+        print(f"{len(failed)} benchmark(s) failed their correctness check")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
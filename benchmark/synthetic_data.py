@@ -0,0 +1,189 @@
+import math
+import os
+from typing import Dict, List, Tuple
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import rasterio
+from rasterio.transform import from_bounds
+from shapely.geometry import box
+
+# Rough bounding box of Ethiopia in EPSG:4326 (west, south, east, north)
+ETHIOPIA_BOUNDS = (33.0, 3.4, 48.0, 14.9)
+
+# Same nodata value the WorldPop rasters use
+NO_DATA_VALUE = -99999.0
+
+LST_COLUMNS = ['lst_day', 'lst_night', 'lst_mean']
+PRECIP_COLUMNS = ['totprec']  # has_data is derived from totprec
+SPECTRAL_COLUMNS = ['ndvi', 'savi', 'evi', 'ndwi5', 'ndwi6']
+
+
+def woreda_names(num_zones: int) -> List[str]:
+    return [f"W{i:05d}" for i in range(num_zones)]
+
+
+def make_woreda_grid(num_zones: int, num_regions: int = 11, zones_per_zone2: int = 8) -> gpd.GeoDataFrame:
+    """Build a grid of square polygons standing in for the woreda shapefile.
+
+    The columns mirror ET_Admin3C_2023.3.shp (ADMIN1, ADMIN2, ADMIN3, FNID) so the
+    frame can be passed anywhere the real shapefile is used. The index starts at 1:
+    the pop/ script burns the index into a raster with fill=0, so a zone at index 0
+    would be lost as background.
+    """
+    west, south, east, north = ETHIOPIA_BOUNDS
+    cols = math.ceil(math.sqrt(num_zones))
+    rows = math.ceil(num_zones / cols)
+    width = (east - west) / cols
+    height = (north - south) / rows
+
+    names = woreda_names(num_zones)
+    records = []
+    for i in range(num_zones):
+        row, col = divmod(i, cols)
+        x0 = west + col * width
+        y1 = north - row * height
+        records.append({
+            'ADMIN1': f"Region{i * num_regions // num_zones:02d}",
+            'ADMIN2': f"Zone{i // zones_per_zone2:04d}",
+            'ADMIN3': names[i],
+            'FNID': f"ET2023A3{i:05d}",
+            'geometry': box(x0, y1 - height, x0 + width, y1),
+        })
+
+    return gpd.GeoDataFrame(records, geometry='geometry', crs='EPSG:4326', index=range(1, num_zones + 1))
+
+
+def write_population_raster(path: str, pixels: int, nodata_fraction: float = 0.05, seed: int = 0) -> np.ndarray:
+    """Write a single-band float32 GeoTIFF shaped like a WorldPop population raster.
+
+    Returns the array that was written (nodata cells included).
+    """
+    rng = np.random.default_rng(seed)
+    data = rng.gamma(shape=0.5, scale=20.0, size=(pixels, pixels)).astype('float32')
+    data[rng.random((pixels, pixels)) < nodata_fraction] = NO_DATA_VALUE
+
+    transform = from_bounds(*ETHIOPIA_BOUNDS, width=pixels, height=pixels)
+    with rasterio.open(
+        path, 'w', driver='GTiff', height=pixels, width=pixels, count=1,
+        dtype='float32', crs='EPSG:4326', transform=transform, nodata=NO_DATA_VALUE,
+    ) as dst:
+        dst.write(data, 1)
+
+    return data
+
+
+def write_population_rasters(directory: str, pixels: int, years: List[int], seed: int = 0) -> Dict[int, str]:
+    paths = {}
+    for offset, year in enumerate(years):
+        path = os.path.join(directory, f'eth_ppp_{year}_UNadj.tif')
+        write_population_raster(path, pixels, seed=seed + offset)
+        paths[year] = path
+    return paths
+
+
+def _daily_frame(names: List[str], years: List[int]) -> pd.DataFrame:
+    frames = []
+    for year in years:
+        days = pd.Timestamp(year=year, month=12, day=31).dayofyear
+        doy = np.tile(np.arange(1, days + 1), len(names))
+        woreda = np.repeat(names, days)
+        frames.append(pd.DataFrame({
+            'wid': np.repeat(np.arange(len(names)), days),
+            'woreda': woreda,
+            'year': year,
+            'doy': doy,
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def _inject_missing(df: pd.DataFrame, columns: List[str], rng: np.random.Generator,
+                    missing_fraction: float, gap_fraction: float, max_gap: int) -> Dict[str, np.ndarray]:
+    """Blank out values at random plus a few runs of consecutive days.
+
+    Returns the boolean mask of blanked rows per column so callers can verify reports.
+    """
+    n = len(df)
+    missing_masks = {}
+    for column in columns:
+        mask = rng.random(n) < missing_fraction
+        # Sensor outages show up as runs of consecutive missing days
+        for start in rng.choice(n, size=max(1, int(n * gap_fraction)), replace=False):
+            mask[start:start + rng.integers(1, max_gap + 1)] = True
+        df.loc[mask, column] = np.nan
+        missing_masks[column] = mask
+    return missing_masks
+
+
+def make_weather_frames(num_zones: int, years: List[int], missing_fraction: float = 0.05,
+                        gap_fraction: float = 0.001, max_gap: int = 30,
+                        seed: int = 0) -> Tuple[Dict[str, pd.DataFrame], Dict[str, Dict[str, np.ndarray]]]:
+    """Build daily LST, precipitation and spectral frames in the Earth Engine export layout.
+
+    Returns the frames keyed by dataset name and, for each, the injected missing-value
+    masks keyed by column (aligned with the frame's rows).
+    """
+    rng = np.random.default_rng(seed)
+    base = _daily_frame(woreda_names(num_zones), years)
+    n = len(base)
+
+    lst = base.copy()
+    lst['lst_day'] = rng.normal(32.0, 5.0, n)
+    lst['lst_night'] = rng.normal(15.0, 4.0, n)
+    lst['lst_mean'] = (lst['lst_day'] + lst['lst_night']) / 2
+
+    precip = base.copy()
+    precip['totprec'] = rng.gamma(0.4, 8.0, n)
+    precip['has_data'] = 1.0
+
+    spectral = base.copy()
+    for column in SPECTRAL_COLUMNS:
+        spectral[column] = rng.uniform(-0.2, 0.9, n)
+
+    frames = {'LST Data': lst, 'Precipitation Data': precip, 'Spectral Data': spectral}
+    missing = {}
+    for (name, df), columns in zip(frames.items(), [LST_COLUMNS, PRECIP_COLUMNS, SPECTRAL_COLUMNS]):
+        missing[name] = _inject_missing(df, columns, rng, missing_fraction, gap_fraction, max_gap)
+    precip['has_data'] = precip['totprec'].notnull().astype(float)
+
+    return frames, missing
+
+
+def write_weather_csvs(directory: str, frames: Dict[str, pd.DataFrame]) -> Dict[str, str]:
+    """Write the frames under the Earth Engine export names the scripts load.
+
+    The names are fixed because simulate_case_report/generate_simulated_data.py
+    opens them literally; they also match the globs used in weather/.
+    """
+    file_names = {
+        'LST Data': 'Export_LST_Data_2002-01-01_2024-07-01.csv',
+        'Precipitation Data': 'Export_Precip_Data_2002-01-01_2024-07-01.csv',
+        'Spectral Data': 'Export_Spectral_Data_2002-01-01_2024-07-01.csv',
+    }
+    paths = {}
+    for name, df in frames.items():
+        path = os.path.join(directory, file_names[name])
+        df.to_csv(path, index=False)
+        paths[name] = path
+    return paths
+
+
+def write_woreda_to_region(directory: str, grid: gpd.GeoDataFrame) -> str:
+    path = os.path.join(directory, 'woreda_to_region.csv')
+    grid[['ADMIN3', 'ADMIN2', 'ADMIN1']].to_csv(path, index=False)
+    return path
+
+
+def write_population_csv(directory: str, num_zones: int, years: List[int], seed: int = 0) -> str:
+    """Write population_data.csv in the layout produced by the pop/ aggregation script."""
+    rng = np.random.default_rng(seed)
+    names = woreda_names(num_zones)
+    df = pd.DataFrame({
+        'ADMIN3': np.tile(names, len(years)),
+        'year': np.repeat(years, num_zones),
+        'popcount': rng.integers(5_000, 400_000, num_zones * len(years)).astype(float),
+    })
+    path = os.path.join(directory, 'population_data.csv')
+    df.to_csv(path, index=False)
+    return path